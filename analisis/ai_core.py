@@ -1,5 +1,6 @@
 import aiohttp
 import json
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any
 import logging
@@ -29,13 +30,18 @@ class DeepSeekAnalyzer:
         analysis_methods: List[str],
         timeframe: str,
         news_data: List[Dict] = None,
-        fundamental_data: Dict = None
+        fundamental_data: Dict = None,
+        indicators: Dict[str, np.ndarray] = None
     ) -> AISignal:
-        """Основной метод анализа через DeepSeek API"""
+        """Основной метод анализа через DeepSeek API
+        
+        indicators - заранее рассчитанные precompute_indicators() массивы
+        по полному ряду, df в этом случае должен быть его префиксом.
+        """
         
         # Подготовка данных для ИИ
         market_context = self._prepare_market_context(
-            symbol, df, analysis_methods, timeframe, news_data, fundamental_data
+            symbol, df, analysis_methods, timeframe, news_data, fundamental_data, indicators
         )
         
         # Создание промпта для DeepSeek
@@ -54,7 +60,8 @@ class DeepSeekAnalyzer:
         analysis_methods: List[str],
         timeframe: str,
         news_data: List[Dict],
-        fundamental_data: Dict
+        fundamental_data: Dict,
+        indicators: Dict[str, np.ndarray] = None
     ) -> Dict[str, Any]:
         """Подготовка полного контекста рынка для ИИ"""
         
@@ -65,7 +72,7 @@ class DeepSeekAnalyzer:
             'price_action': self._summarize_price_action(df),
             'volume_analysis': self._analyze_volume(df),
             'requested_methods': analysis_methods,
-            'technical_indicators': self._calculate_technical_indicators(df),
+            'technical_indicators': self._calculate_technical_indicators(df, indicators),
             'key_levels': self._find_key_levels(df),
             'market_sentiment': self._get_market_sentiment(df),
             'news_summary': self._summarize_news(news_data) if news_data else "Новости не предоставлены",
@@ -229,8 +236,13 @@ class DeepSeekAnalyzer:
         Изменение к предыдущей свече: {((current['close'] - prev['close']) / prev['close'] * 100):.2f}%
         """
     
-    def _calculate_technical_indicators(self, df: pd.DataFrame) -> Dict:
-        """Расчет технических индикаторов"""
+    def precompute_indicators(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Расчет индикаторов сразу по всему ряду
+        
+        Все индикаторы причинные, поэтому значение в позиции i совпадает
+        с расчетом по df.iloc[:i + 1] - один проход вместо пересчета
+        на каждой точке бэктеста.
+        """
         # RSI
         delta = df['close'].diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
@@ -248,12 +260,31 @@ class DeepSeekAnalyzer:
         sma50 = df['close'].rolling(50).mean()
         
         return {
-            'rsi': round(rsi.iloc[-1], 2),
-            'macd': round(macd.iloc[-1], 2),
-            'macd_signal': round(macd_signal.iloc[-1], 2),
-            'sma_20': round(sma20.iloc[-1], 2),
-            'sma_50': round(sma50.iloc[-1], 2),
-            'price_vs_sma20': f"{((df['close'].iloc[-1] - sma20.iloc[-1]) / sma20.iloc[-1] * 100):.2f}%"
+            'rsi': rsi.to_numpy(),
+            'macd': macd.to_numpy(),
+            'macd_signal': macd_signal.to_numpy(),
+            'sma_20': sma20.to_numpy(),
+            'sma_50': sma50.to_numpy()
+        }
+    
+    def _calculate_technical_indicators(self, df: pd.DataFrame,
+                                        indicators: Dict[str, np.ndarray] = None) -> Dict:
+        """Расчет технических индикаторов"""
+        if indicators is None:
+            indicators = self.precompute_indicators(df)
+        
+        # Последняя свеча df в координатах предрассчитанных массивов
+        i = len(df) - 1
+        close = df['close'].iloc[-1]
+        sma20 = indicators['sma_20'][i]
+        
+        return {
+            'rsi': round(indicators['rsi'][i], 2),
+            'macd': round(indicators['macd'][i], 2),
+            'macd_signal': round(indicators['macd_signal'][i], 2),
+            'sma_20': round(sma20, 2),
+            'sma_50': round(indicators['sma_50'][i], 2),
+            'price_vs_sma20': f"{((close - sma20) / sma20 * 100):.2f}%"
         }
     
     def _analyze_volume(self, df: pd.DataFrame) -> str:
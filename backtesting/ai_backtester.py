@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Callable
 from dataclasses import dataclass
+from functools import cached_property
 from ..analysis.ai_core import AISignal
 
 @dataclass
@@ -15,6 +16,18 @@ class AIBacktestResult:
     sharpe_ratio: float
     max_drawdown: float
     detailed_results: List[Dict]
+    
+    @cached_property
+    def results_frame(self) -> pd.DataFrame:
+        """detailed_results по столбцам (строится один раз при первом обращении)"""
+        detailed = self.detailed_results
+        return pd.DataFrame({
+            'timestamp': pd.DatetimeIndex([r['timestamp'] for r in detailed]),
+            'action': [r['signal'].action for r in detailed],
+            'confidence': np.array([r['signal'].confidence for r in detailed], dtype=np.float64),
+            'actual_price': np.array([r['actual_price'] for r in detailed], dtype=np.float64),
+            'was_correct': pd.Series([r['was_correct'] for r in detailed], dtype=object),
+        })
 
 class AIBacktester:
     def __init__(self, ai_agent):
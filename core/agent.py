@@ -46,7 +46,7 @@ class CryptoAIAgent:
             df = await self.data_fetcher.get_klines(symbol, timeframe, limit=500)
             
             # Обработка данных
-            df = self.data_processor.add_technical_indicators(df, indicators)
+            df = await self.data_processor.add_technical_indicators_async(df, indicators)
             
             # Получение текущей цены
             current_price = await self.data_fetcher.get_current_price(symbol)
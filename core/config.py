@@ -11,6 +11,8 @@ class BinanceConfig:
     api_secret: str = os.getenv('BINANCE_API_SECRET', '')
     testnet: bool = True
     request_timeout: int = 30
+    redis_url: str = os.getenv('REDIS_URL', '')  # пусто - кэш свечей отключен
+    ohlcv_dtype: str = os.getenv('OHLCV_DTYPE', 'float64')  # 'float32' вдвое экономит память, но PnL считается в float32
 
 @dataclass
 class DeepSeekConfig:
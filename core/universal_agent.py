@@ -1,4 +1,5 @@
 import asyncio
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
@@ -55,7 +56,8 @@ class UniversalAIAgent:
                 'ai_signal': ai_signal,
                 'timestamp': datetime.now(),
                 'data_points': len(df),
-                'analysis_methods': analysis_methods
+                'analysis_methods': analysis_methods,
+                'price_data': df
             }
             
         except Exception as e:
@@ -82,36 +84,49 @@ class UniversalAIAgent:
             # Создание точек анализа
             analysis_points = self._generate_analysis_points(full_df, step)
             
+            # Индикаторы считаем один раз по всему ряду, а не на каждом срезе
+            indicators = self.ai_analyzer.precompute_indicators(full_df)
+            
+            # Позиции точек в индексе: данные до точки включительно - full_df.iloc[:pos]
+            positions = full_df.index.values.searchsorted(analysis_points, side='right')
+            
+            # Точки с недостаточной историей (< 100 свечей) отбрасываем заранее
+            valid = positions >= 100
+            points, positions = analysis_points[valid], positions[valid]
+            
+            # Цена в точке, цена следующей свечи и изменение - одним проходом
+            closes = full_df['close'].to_numpy()
+            last_closes = closes[positions - 1]
+            has_next = positions < closes.size
+            next_closes = np.where(has_next, closes[np.minimum(positions, closes.size - 1)], np.nan)
+            price_changes = (next_closes - last_closes) / last_closes * 100.0
+            
             results = []
-            for point in analysis_points:
+            for i, (point, pos) in enumerate(zip(points, positions)):
                 # Данные до точки анализа
-                historical_data = full_df[full_df.index <= point]
-                
-                if len(historical_data) < 100:
-                    continue
+                historical_data = full_df.iloc[:pos]
                 
                 # Анализ через ИИ
                 ai_signal = await self.ai_analyzer.analyze_market(
                     symbol=symbol,
                     df=historical_data,
                     analysis_methods=analysis_methods,
-                    timeframe=timeframe
+                    timeframe=timeframe,
+                    indicators=indicators
                 )
                 
                 # Фактическая цена на следующий период
-                future_data = full_df[full_df.index > point]
-                if not future_data.empty:
-                    actual_next_price = future_data.iloc[0]['close']
-                    price_change = ((actual_next_price - historical_data['close'].iloc[-1]) / 
-                                   historical_data['close'].iloc[-1] * 100)
+                if has_next[i]:
+                    actual_next_price = next_closes[i]
+                    price_change = price_changes[i]
                 else:
                     actual_next_price = None
                     price_change = None
                 
                 results.append({
-                    'timestamp': point,
+                    'timestamp': pd.Timestamp(point),
                     'signal': ai_signal,
-                    'actual_price': historical_data['close'].iloc[-1],
+                    'actual_price': last_closes[i],
                     'actual_next_price': actual_next_price,
                     'price_change_percent': price_change,
                     'was_correct': self._evaluate_signal(ai_signal, price_change) if price_change else None
@@ -126,7 +141,7 @@ class UniversalAIAgent:
             self.logger.error(f"Ошибка исторического анализа {symbol}: {e}")
             raise
     
-    def _generate_analysis_points(self, df: pd.DataFrame, step: str) -> List[pd.Timestamp]:
+    def _generate_analysis_points(self, df: pd.DataFrame, step: str) -> np.ndarray:
         """Генерация точек для исторического анализа"""
         if step == '1d':
             freq = 'D'
@@ -137,8 +152,9 @@ class UniversalAIAgent:
         else:
             freq = 'D'
         
-        points = pd.date_range(start=df.index[100], end=df.index[-1], freq=freq)
-        return [point for point in points if point in df.index]
+        # Работаем с datetime64[ns] напрямую, без материализации Timestamp
+        points = pd.date_range(start=df.index[100], end=df.index[-1], freq=freq).values
+        return points[np.isin(points, df.index.values)]
     
     def _evaluate_signal(self, signal: AISignal, actual_change: float) -> bool:
         """Оценка корректности сигнала"""
@@ -4,22 +4,37 @@
 """
 
 import dash
-from dash import dcc, html, Input, Output, State, callback_context
+from dash import dcc, html, dash_table, Input, Output, State, Patch, callback_context
+from dash.dash_table import FormatTemplate
 import plotly.graph_objects as go
+import plotly.io as pio
+import numpy as np
 import pandas as pd
 import asyncio
+import concurrent.futures
 import logging
+import threading
 from datetime import datetime, timedelta
 import json
 
 from core.universal_agent import UniversalAIAgent
 from core.config import AppConfig
 from backtesting.enhanced_backtester import EnhancedBacktester
+from visualization.downsample import lttb_indices
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Сериализация фигур в callback'ах через orjson (numpy-массивы кодируются в C)
+pio.json.config.default_engine = "orjson"
+
+# Максимум точек в трейсе графика цены, длинные ряды прореживаются LTTB
+MAX_CHART_POINTS = 2000
+
+# Точек в разреженном трейсе для всплывающих подсказок
+HOVER_POINTS = 200
+
 class BacktestDashboard:
     def __init__(self):
         self.app = dash.Dash(
@@ -36,6 +51,13 @@ class BacktestDashboard:
             logger.error(f"Ошибка инициализации агента: {e}")
             self.agent_ready = False
         
+        # Постоянный event loop в фоновом потоке для всех callback'ов
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        
+        # Кэш отчетов бэктеста: (symbol, timeframe, methods, start, end) -> report
+        self._report_cache = {}
+        
         self.setup_layout()
         self.setup_callbacks()
     
@@ -133,13 +155,16 @@ class BacktestDashboard:
                     dcc.Loading(
                         id="analysis-loading",
                         type="circle",
-                        children=html.Div(id="analysis-results")
+                        children=html.Div([
+                            html.Div(self._get_placeholder_analysis(), id='analysis-message'),
+                            self._create_analysis_skeleton()
+                        ])
                     )
                 ], className='six columns', style={'padding': '20px'}),
                 
                 html.Div([
                     html.H3("График цены"),
-                    dcc.Graph(id='price-chart')
+                    dcc.Graph(id='price-chart', figure=self._get_empty_chart())
                 ], className='six columns', style={'padding': '20px'}),
             ], className='row'),
             
@@ -156,7 +181,10 @@ class BacktestDashboard:
                     ),
                     html.Br(),
                     html.Button('🚀 Запустить бэктест', id='run-backtest-btn', n_clicks=0,
-                               style={'backgroundColor': '#e67e22', 'color': 'white', 'marginTop': '10px'})
+                               style={'backgroundColor': '#e67e22', 'color': 'white', 'marginTop': '10px'}),
+                    html.Br(),
+                    html.Button('🗑 Очистить кэш', id='clear-cache-btn', n_clicks=0,
+                               style={'marginTop': '10px'})
                 ], className='four columns', style={'padding': '20px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px'}),
                 
                 html.Div([
@@ -179,38 +207,82 @@ class BacktestDashboard:
         """Настройка callback'ов"""
         
         @self.app.callback(
-            [Output('analysis-results', 'children'),
-             Output('price-chart', 'figure'),
+            [Output('analysis-message', 'children'),
+             Output('analysis-results', 'style'),
+             Output('signal-title', 'children'),
+             Output('signal-title', 'style'),
+             Output('signal-action', 'children'),
+             Output('signal-action', 'style'),
+             Output('signal-confidence', 'children'),
+             Output('signal-price', 'children'),
+             Output('signal-entry', 'children'),
+             Output('signal-stop-loss', 'children'),
+             Output('signal-take-profit', 'children'),
+             Output('signal-reasoning', 'children'),
              Output('analysis-data', 'data')],
             [Input('analyze-btn', 'n_clicks')],
             [State('symbol-input', 'value'),
              State('timeframe-dropdown', 'value'),
-             State('methods-checklist', 'value')]
+             State('methods-checklist', 'value')],
+            prevent_initial_call=True
         )
         def update_analysis(n_clicks, symbol, timeframe, methods):
             if n_clicks == 0 or not self.agent_ready:
-                return self._get_placeholder_analysis(), self._get_empty_chart(), None
+                return self._analysis_message_outputs(self._get_placeholder_analysis())
             
             try:
-                # Запуск анализа в отдельном потоке
-                async def run_analysis():
-                    return await self.agent.analyze_pair(
-                        symbol=symbol,
-                        timeframe=timeframe,
-                        analysis_methods=methods,
-                        include_news=True,
-                        include_fundamental=True
-                    )
-                
-                result = asyncio.run(run_analysis())
+                # Запуск анализа в фоновом event loop
+                result = self._run_async(self.agent.analyze_pair(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    analysis_methods=methods,
+                    include_news=True,
+                    include_fundamental=True
+                ), timeout=60)
                 
-                # Создание графика цены
-                price_chart = self._create_price_chart(result)
+                # Обновляем только значения в готовом каркасе, график строится на клиенте из Store
+                chart_data = self._price_chart_data(result)
                 
-                return self._create_analysis_layout(result), price_chart, result
+                return (None, {'display': 'block'}) + self._analysis_outputs(result) + (chart_data,)
                 
             except Exception as e:
-                return self._create_error_layout(f"Ошибка анализа: {str(e)}"), self._get_empty_chart(), None
+                return self._analysis_message_outputs(
+                    self._create_error_layout(f"Ошибка анализа: {str(e)}")
+                )
+        
+        # График цены перерисовывается в браузере из analysis-data без запроса к серверу
+        self.app.clientside_callback(
+            """
+            function(data) {
+                var layout = {
+                    xaxis: {title: {text: 'Время'}},
+                    yaxis: {title: {text: 'Цена ($)'}},
+                    showlegend: true,
+                    uirevision: 'keep'
+                };
+                if (!data) {
+                    layout.title = {text: 'График появится после анализа'};
+                    return {data: [
+                        {x: [], y: [], type: 'scattergl', mode: 'lines', name: 'Price', hoverinfo: 'skip'},
+                        {x: [], y: [], type: 'scatter', mode: 'markers', name: 'Price',
+                         marker: {opacity: 0}, showlegend: false}
+                    ], layout: layout};
+                }
+                layout.title = {text: 'График цены ' + data.symbol};
+                return {
+                    data: [
+                        {x: data.ts, y: data.close, type: 'scattergl', mode: 'lines', name: 'Price', hoverinfo: 'skip'},
+                        {x: data.hover_ts, y: data.hover_close, type: 'scatter', mode: 'markers', name: 'Price',
+                         marker: {opacity: 0}, showlegend: false}
+                    ],
+                    layout: layout
+                };
+            }
+            """,
+            Output('price-chart', 'figure'),
+            Input('analysis-data', 'data'),
+            prevent_initial_call=True
+        )
         
         @self.app.callback(
             [Output('backtest-section', 'style'),
@@ -238,25 +310,64 @@ class BacktestDashboard:
                 return html.Div("Настройте параметры и запустите бэктест")
             
             try:
-                async def run_async_backtest():
-                    return await self.backtester.run_enhanced_backtest(
+                # Повторный запуск с теми же параметрами отдаем из кэша
+                cache_key = (symbol, timeframe, tuple(sorted(methods or [])), start_date, end_date)
+                report = self._report_cache.get(cache_key)
+                
+                if report is None:
+                    result = self._run_async(self.backtester.run_enhanced_backtest(
                         symbol=symbol,
                         timeframe=timeframe,
                         analysis_methods=methods,
                         start_date=start_date,
                         end_date=end_date
-                    )
-                
-                result = asyncio.run(run_async_backtest())
-                report = self.backtester.generate_comprehensive_report(result, symbol, timeframe)
+                    ))
+                    report = self.backtester.generate_comprehensive_report(result, symbol, timeframe)
+                    self._report_cache[cache_key] = report
                 
                 return self._create_backtest_layout(report, symbol, timeframe)
                 
             except Exception as e:
                 return self._create_error_layout(f"Ошибка бэктеста: {str(e)}")
+        
+        @self.app.callback(
+            Output('backtest-results', 'children', allow_duplicate=True),
+            [Input('clear-cache-btn', 'n_clicks')],
+            prevent_initial_call=True
+        )
+        def clear_backtest_cache(n_clicks):
+            self._report_cache.clear()
+            return html.Div("Кэш бэктестов очищен")
     
-    def _create_analysis_layout(self, result):
-        """Создание layout с результатами анализа"""
+    def _create_analysis_skeleton(self):
+        """Каркас результатов анализа со стабильными id для точечных обновлений"""
+        block_style = {'padding': '15px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px'}
+        
+        return html.Div([
+            html.Div([
+                html.H4(id='signal-title'),
+                html.P(id='signal-action', style={'fontSize': '24px', 'fontWeight': 'bold'}),
+                html.P(id='signal-confidence'),
+                html.P(id='signal-price'),
+            ], style={**block_style, 'marginBottom': '15px'}),
+            
+            html.Div([
+                html.H5("📊 Параметры сделки"),
+                html.Table([
+                    html.Tr([html.Td("Цена входа:"), html.Td(id='signal-entry')]),
+                    html.Tr([html.Td("Стоп-лосс:"), html.Td(id='signal-stop-loss')]),
+                    html.Tr([html.Td("Тейк-профит:"), html.Td(id='signal-take-profit')]),
+                ], style={'width': '100%'})
+            ], style={**block_style, 'marginBottom': '15px'}),
+            
+            html.Div([
+                html.H5("📝 Обоснование"),
+                html.P(id='signal-reasoning', style={'textAlign': 'justify'})
+            ], style=block_style),
+        ], id='analysis-results', style={'display': 'none'})
+    
+    def _analysis_outputs(self, result):
+        """Значения полей каркаса результатов анализа"""
         signal = result['ai_signal']
         
         # Цвет сигнала
@@ -270,51 +381,86 @@ class BacktestDashboard:
             signal_color = '#f39c12'
             signal_emoji = '🟡'
         
-        return html.Div([
-            html.Div([
-                html.H4(f"{signal_emoji} Торговый сигнал", style={'color': signal_color}),
-                html.P(f"Действие: {signal.action}", style={'fontSize': '24px', 'fontWeight': 'bold', 'color': signal_color}),
-                html.P(f"Уверенность: {signal.confidence:.1%}"),
-                html.P(f"Текущая цена: ${result['current_price']:.2f}"),
-            ], style={'padding': '15px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px', 'marginBottom': '15px'}),
-            
-            html.Div([
-                html.H5("📊 Параметры сделки"),
-                html.Table([
-                    html.Tr([html.Td("Цена входа:"), html.Td(f"${signal.entry_price:.2f}")]),
-                    html.Tr([html.Td("Стоп-лосс:"), html.Td(f"${signal.stop_loss:.2f}")]),
-                    html.Tr([html.Td("Тейк-профит:"), html.Td(f"${signal.take_profit:.2f}")]),
-                ], style={'width': '100%'})
-            ], style={'padding': '15px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px', 'marginBottom': '15px'}),
-            
-            html.Div([
-                html.H5("📝 Обоснование"),
-                html.P(signal.reasoning, style={'textAlign': 'justify'})
-            ], style={'padding': '15px', 'backgroundColor': '#f8f9fa', 'borderRadius': '10px'}),
-        ])
+        # Меняем только цвет, остальной стиль остается на клиенте
+        color_patch = Patch()
+        color_patch['color'] = signal_color
+        
+        return (
+            f"{signal_emoji} Торговый сигнал",
+            color_patch,
+            f"Действие: {signal.action}",
+            color_patch,
+            f"Уверенность: {signal.confidence:.1%}",
+            f"Текущая цена: ${result['current_price']:.2f}",
+            f"${signal.entry_price:.2f}",
+            f"${signal.stop_loss:.2f}",
+            f"${signal.take_profit:.2f}",
+            signal.reasoning,
+        )
     
-    def _create_price_chart(self, result):
-        """Создание графика цены"""
-        # Здесь можно добавить реальный график цены
-        # Для демонстрации создаем простой линейный график
-        fig = go.Figure()
+    def _analysis_message_outputs(self, message):
+        """Вывод сообщения вместо результатов анализа (заглушка или ошибка)"""
+        return (message, {'display': 'none'}) + (dash.no_update,) * 10 + (None,)
+    
+    def _price_chart_data(self, result):
+        """Данные графика цены для analysis-data (фигура собирается на клиенте)"""
+        df = result['price_data']
+        close = df['close'].to_numpy()
         
-        fig.add_trace(go.Scatter(
-            x=[1, 2, 3, 4, 5],
-            y=[result['current_price'] * 0.95, result['current_price'] * 0.98, 
-               result['current_price'], result['current_price'] * 1.02, result['current_price'] * 1.05],
-            mode='lines+markers',
-            name='Price'
-        ))
+        # Не больше MAX_CHART_POINTS точек независимо от длины истории
+        idx = lttb_indices(df.index.asi8, close, MAX_CHART_POINTS)
         
-        fig.update_layout(
-            title=f"График цены {result['symbol']}",
-            xaxis_title="Время",
-            yaxis_title="Цена ($)",
-            showlegend=True
+        # Подсказки только по каждой N-й точке, плотная линия без hover
+        hover_idx = idx[::max(1, len(idx) // HOVER_POINTS)]
+        
+        # Только сериализуемые массивы: время и цены закрытия
+        return {
+            'symbol': result['symbol'],
+            'ts': df.index[idx],
+            'close': close[idx],
+            'hover_ts': df.index[hover_idx],
+            'hover_close': close[hover_idx],
+        }
+    
+    def _run_async(self, coro, timeout=None):
+        """Выполнение корутины в постоянном event loop дашборда"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # Не оставляем анализ работать в фоне после того, как показали ошибку
+            future.cancel()
+            raise
+    
+    def _trades_table(self, trades):
+        """Таблица сделок: форматирование колонок векторно, строки рендерит DataTable"""
+        tdf = pd.DataFrame(
+            trades, columns=['entry_time', 'exit_time', 'entry_price', 'exit_price', 'pnl', 'success']
         )
+        for col in ('entry_time', 'exit_time'):
+            tdf[col] = pd.to_datetime(tdf[col]).dt.strftime('%m/%d %H:%M')
+        tdf[['entry_price', 'exit_price', 'pnl']] = tdf[['entry_price', 'exit_price', 'pnl']].astype(float).round(2)
+        tdf['success'] = np.where(tdf['success'].astype(bool), "✅", "❌")
         
-        return fig
+        money = FormatTemplate.money(2)
+        return dash_table.DataTable(
+            data=tdf.to_dict('records'),
+            columns=[
+                {'name': "Вход", 'id': 'entry_time'},
+                {'name': "Выход", 'id': 'exit_time'},
+                {'name': "Входная цена", 'id': 'entry_price', 'type': 'numeric', 'format': money},
+                {'name': "Выходная цена", 'id': 'exit_price', 'type': 'numeric', 'format': money},
+                {'name': "PnL", 'id': 'pnl', 'type': 'numeric', 'format': money},
+                {'name': "Результат", 'id': 'success'},
+            ],
+            page_size=20,
+            style_table={'width': '100%'},
+            style_cell={'fontSize': '12px', 'textAlign': 'left'},
+            style_data_conditional=[
+                {'if': {'filter_query': '{pnl} > 0', 'column_id': 'pnl'}, 'color': 'green'},
+                {'if': {'filter_query': '{pnl} <= 0', 'column_id': 'pnl'}, 'color': 'red'},
+            ]
+        )
     
     def _create_backtest_layout(self, report, symbol, timeframe):
         """Создание layout с результатами бэктеста"""
@@ -346,26 +492,8 @@ class BacktestDashboard:
             ], className='row', style={'marginBottom': '20px'}),
             
             html.Div([
-                html.H5("📋 Последние сделки"),
-                html.Table([
-                    html.Tr([
-                        html.Th("Вход"),
-                        html.Th("Выход"),
-                        html.Th("Входная цена"),
-                        html.Th("Выходная цена"),
-                        html.Th("PnL"),
-                        html.Th("Результат")
-                    ])
-                ] + [
-                    html.Tr([
-                        html.Td(trade['entry_time'].strftime('%m/%d %H:%M')),
-                        html.Td(trade['exit_time'].strftime('%m/%d %H:%M')),
-                        html.Td(f"${trade['entry_price']:.2f}"),
-                        html.Td(f"${trade['exit_price']:.2f}"),
-                        html.Td(f"${trade['pnl']:.2f}", style={'color': 'green' if trade['pnl'] > 0 else 'red'}),
-                        html.Td("✅" if trade['success'] else "❌")
-                    ]) for trade in report['trades'][:5]
-                ], style={'width': '100%', 'fontSize': '12px'})
+                html.H5("📋 Сделки"),
+                self._trades_table(report['trades'])
             ])
         ])
     
@@ -385,10 +513,18 @@ class BacktestDashboard:
     def _get_empty_chart(self):
         """Пустой график"""
         fig = go.Figure()
+        
+        # Пустые трейсы (линия и точки подсказок), заполняются из analysis-data после анализа
+        fig.add_trace(go.Scattergl(x=[], y=[], mode='lines', name='Price', hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=[], y=[], mode='markers', name='Price',
+                                 marker=dict(opacity=0), showlegend=False))
+        
         fig.update_layout(
             title="График появится после анализа",
             xaxis_title="Время",
-            yaxis_title="Цена ($)"
+            yaxis_title="Цена ($)",
+            showlegend=True,
+            uirevision='keep'
         )
         return fig
     
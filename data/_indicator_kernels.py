@@ -0,0 +1,189 @@
+"""JIT-ядра технических индикаторов для DataProcessor
+
+Цены читаются через float(): суммы и рекуррентное состояние ведутся в float64
+и с Numba, и без нее, в какой бы dtype ни писался результат.
+
+Компилируются Numba лениво, при первом вызове, с cache=True: машинный код
+сохраняется в __pycache__, и повторные запуски процесса загружают его без
+JIT-компиляции. Импорт модуля ничего не компилирует.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # без Numba ядра индикаторов выполняются как обычный Python
+    njit = None
+
+# Скомпилированы ли ядра (иначе скользящие окна выгоднее считать векторно)
+HAS_NUMBA = njit is not None
+
+
+def _jit(**options):
+    """Компиляция ядра через numba.njit, если Numba установлена"""
+    def wrap(fn):
+        return njit(**options)(fn) if njit is not None else fn
+    return wrap
+
+
+@_jit(cache=True, nogil=True, fastmath=True)
+def rsi_wilder(close, period):
+    """RSI со сглаживанием Уайлдера за один проход по ценам закрытия"""
+    n = close.shape[0]
+    out = np.full(n, np.nan, dtype=close.dtype)
+    if n <= period:
+        return out
+    
+    # Начальные средние - простое среднее первых period изменений
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = float(close[i]) - float(close[i - 1])
+        avg_gain += max(delta, 0.0)
+        avg_loss += max(-delta, 0.0)
+    avg_gain /= period
+    avg_loss /= period
+    
+    for i in range(period, n):
+        if i > period:
+            delta = float(close[i]) - float(close[i - 1])
+            avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+        if avg_loss == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@_jit(cache=True, nogil=True, fastmath=True)
+def macd(close, fast, slow, signal):
+    """MACD, сигнальная линия и гистограмма за один проход (столбцы результата)"""
+    n = close.shape[0]
+    out = np.empty((n, 3), dtype=close.dtype)
+    af = 2.0 / (fast + 1)
+    a_slow = 2.0 / (slow + 1)
+    a_sig = 2.0 / (signal + 1)
+    
+    if n == 0:
+        return out
+    
+    # EMA рекуррентно (adjust=False, как в TradingView), старт с первой цены
+    ema_fast = ema_slow = float(close[0])
+    sig = 0.0
+    for i in range(n):
+        x = float(close[i])
+        ema_fast = af * x + (1.0 - af) * ema_fast
+        ema_slow = a_slow * x + (1.0 - a_slow) * ema_slow
+        m = ema_fast - ema_slow
+        sig = a_sig * m + (1.0 - a_sig) * sig
+        
+        out[i, 0] = m
+        out[i, 1] = sig
+        out[i, 2] = m - sig
+    return out
+
+
+@_jit(cache=True, nogil=True, fastmath=True)
+def bbands(close, period, k):
+    """Полосы Боллинджера скользящими моментами: средняя, верхняя, нижняя, ширина"""
+    n = close.shape[0]
+    out = np.full((n, 4), np.nan, dtype=close.dtype)
+    if n < period:
+        return out
+    
+    # Среднее и сумма квадратов отклонений первого окна
+    mean = 0.0
+    for i in range(period):
+        mean += float(close[i])
+    mean /= period
+    m2 = 0.0
+    for i in range(period):
+        m2 += (float(close[i]) - mean) ** 2
+    
+    for i in range(period - 1, n):
+        if i >= period:
+            # Сдвиг окна по Уэлфорду: без накопления ошибки, как у суммы квадратов
+            x_in = float(close[i])
+            x_out = float(close[i - period])
+            new_mean = mean + (x_in - x_out) / period
+            m2 += (x_in - x_out) * (x_in - new_mean + x_out - mean)
+            mean = new_mean
+        # Выборочное стандартное отклонение (ddof=1), как rolling().std()
+        std = np.sqrt(max(m2, 0.0) / (period - 1))
+        out[i, 0] = mean
+        out[i, 1] = mean + k * std
+        out[i, 2] = mean - k * std
+        out[i, 3] = 2.0 * k * std / mean
+    return out
+
+
+@_jit(cache=True, nogil=True, fastmath=True)
+def ema_sma(close, ema_periods, sma_periods):
+    """EMA и SMA по списку периодов: столбец на период, сначала все EMA, затем SMA"""
+    n = close.shape[0]
+    n_ema = ema_periods.shape[0]
+    out = np.full((n, n_ema + sma_periods.shape[0]), np.nan, dtype=close.dtype)
+    
+    # Столбцов всего несколько - параллелизм дают потоки вызывающих (nogil)
+    for j in range(out.shape[1]):
+        if j < n_ema:
+            # EMA рекуррентно (adjust=False), старт с первой цены
+            alpha = 2.0 / (ema_periods[j] + 1)
+            ema = float(close[0]) if n > 0 else 0.0
+            for i in range(n):
+                ema = alpha * float(close[i]) + (1.0 - alpha) * ema
+                out[i, j] = ema
+        else:
+            # SMA скользящей суммой окна
+            period = sma_periods[j - n_ema]
+            total = 0.0
+            for i in range(n):
+                total += float(close[i])
+                if i >= period:
+                    total -= float(close[i - period])
+                if i >= period - 1:
+                    out[i, j] = total / period
+    return out
+
+
+@_jit(cache=True, nogil=True)
+def last_window_maxima(values, window, count):
+    """Последние count значений, равных максимуму центрированного окна
+
+    Окно как у rolling(window, center=True): для точки i - [i - window // 2,
+    i + (window - 1) // 2]. Максимум окна ведется монотонной очередью индексов.
+    """
+    n = values.shape[0]
+    
+    # Кольцевой буфер последних найденных значений
+    found = np.empty(count)
+    total = 0
+    
+    # Очередь индексов с убывающими значениями, в голове - максимум окна
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    shift = (window - 1) - window // 2
+    for end in range(n):
+        while tail > head and values[queue[tail - 1]] <= values[end]:
+            tail -= 1
+        queue[tail] = end
+        tail += 1
+        if queue[head] <= end - window:
+            head += 1
+        if end < window - 1:
+            continue
+        
+        center = end - shift
+        if values[center] == values[queue[head]]:
+            found[total % count] = values[center]
+            total += 1
+    
+    # Развернуть кольцевой буфер в хронологическом порядке
+    size = min(total, count)
+    out = np.empty(size)
+    for j in range(size):
+        out[j] = found[(total - size + j) % count]
+    return out
+
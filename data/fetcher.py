@@ -1,16 +1,57 @@
 import pandas as pd
 import numpy as np
+import asyncio
+import functools
+import io
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from binance.client import Client
 from binance.enums import *
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from ..core.config import BinanceConfig
 
+try:
+    import redis
+except ImportError:  # Redis-кэш свечей опционален
+    redis = None
+
+# Столбцы свечей в порядке хранения
+_OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Длительность интервала Binance в секундах по суффиксу ('15m', '4h', '1d', ...)
+_INTERVAL_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000}
+
+# Время жизни кэша текущих цен, секунды
+_TICKER_TTL = 1.0
+
+# Сколько закрытых исторических окон свечей держать в памяти процесса
+_KLINES_LRU_SIZE = 32
+
 class DataFetcher:
     def __init__(self, config: BinanceConfig):
         self.client = Client(config.api_key, config.api_secret, testnet=config.testnet)
         self.logger = logging.getLogger(__name__)
+        self.ohlcv_dtype = np.dtype(config.ohlcv_dtype)
+        
+        # Синхронный клиент Binance вызываем в пуле потоков, не блокируя event loop
+        self._executor = ThreadPoolExecutor(max_workers=8)
+        self.cache = (
+            redis.Redis.from_url(config.redis_url)
+            if redis is not None and config.redis_url else None
+        )
+        
+        # Кэш цен всех пар: symbol -> (время получения, цена)
+        self._ticker_cache: Dict[str, Tuple[float, float]] = {}
+        self._tickers_refresh: Optional[asyncio.Task] = None
+        
+        # Загружаемые сейчас свечи: ключ кэша -> задача загрузки
+        self._klines_inflight: Dict[str, asyncio.Task] = {}
+        
+        # LRU закрытых окон (с end_str): одна история на несколько бэктестов
+        self._klines_lru: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
         
     async def get_klines(
         self, 
@@ -21,48 +62,237 @@ class DataFetcher:
         limit: int = 500
     ) -> pd.DataFrame:
         """Получение исторических данных"""
-        try:
-            klines = self.client.get_klines(
-                symbol=symbol,
-                interval=interval,
-                start_str=start_str,
-                end_str=end_str,
-                limit=limit
+        cache_key = f"kl:binance:{symbol}:{interval}:{start_str}:{end_str}:{limit}:{self.ohlcv_dtype}"
+        df = self._lru_get(cache_key)
+        if df is not None:
+            return df
+        
+        df = await self._cache_get(cache_key)
+        if df is not None:
+            if end_str is not None:
+                self._lru_set(cache_key, df)
+            return df
+        
+        # Одинаковые параллельные запросы ждут одну загрузку. Загрузка - отдельная
+        # задача под shield: отмена любого из вызывающих не затрагивает остальных
+        task = self._klines_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._load_klines(cache_key, symbol, interval, start_str, end_str, limit)
             )
+            self._klines_inflight[cache_key] = task
+            task.add_done_callback(functools.partial(self._klines_loaded, cache_key))
+        return (await asyncio.shield(task)).copy()
+    
+    async def _load_klines(
+        self,
+        cache_key: str,
+        symbol: str,
+        interval: str,
+        start_str: Optional[str],
+        end_str: Optional[str],
+        limit: int
+    ) -> pd.DataFrame:
+        """Загрузка свечей с биржи и запись в кэши"""
+        df = await self._fetch_klines(symbol, interval, start_str, end_str, limit)
+        await self._cache_set(cache_key, df, self._klines_ttl(interval, end_str))
+        if end_str is not None:
+            self._lru_set(cache_key, df)
+        return df
+    
+    def _klines_loaded(self, cache_key: str, task: asyncio.Task):
+        """Снятие завершенной загрузки свечей из списка текущих"""
+        del self._klines_inflight[cache_key]
+        if not task.cancelled():
+            task.exception()  # ошибку получат ожидающие, без предупреждения, если их не осталось
+    
+    async def get_klines_many(
+        self,
+        symbols: List[str],
+        interval: str,
+        max_concurrency: int = 8,
+        **kwargs
+    ) -> Dict[str, pd.DataFrame]:
+        """Параллельное получение свечей по нескольким парам"""
+        # Ограничиваем число одновременных запросов из-за лимитов Binance
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(symbol: str) -> pd.DataFrame:
+            async with semaphore:
+                return await self.get_klines(symbol, interval, **kwargs)
+        
+        frames = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return dict(zip(symbols, frames))
+    
+    async def _fetch_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_str: Optional[str],
+        end_str: Optional[str],
+        limit: int
+    ) -> pd.DataFrame:
+        """Загрузка свечей с биржи"""
+        try:
+            params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+            if start_str is not None:
+                params['startTime'] = self._parse_datetime_to_ms(start_str)
+            if end_str is not None:
+                params['endTime'] = self._parse_datetime_to_ms(end_str)
             
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
+            klines = await self._run(self.client.get_klines, **params)
             
-            # Конвертация типов
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col])
-                
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            # Только OHLCV-поля, сразу в float64 одним вызовом:
+            # timestamp, open, high, low, close, volume
+            arr = np.asarray([row[:6] for row in klines], dtype=np.float64).reshape(-1, 6)
+            ohlcv = arr[:, 1:].astype(self.ohlcv_dtype, copy=False)
             
-            return df
+            return self._klines_frame(arr[:, 0].astype(np.int64) * 1_000_000, ohlcv)
             
         except Exception as e:
             self.logger.error(f"Error fetching data for {symbol}: {e}")
             raise
+    
+    @staticmethod
+    def _parse_datetime_to_ms(date_str: str) -> int:
+        """Перевод даты (UTC) в миллисекунды для startTime/endTime"""
+        # Быстрый путь для основного формата 'YYYY-MM-DD' (DatePickerRange, CLI)
+        if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+            dt = datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]),
+                          tzinfo=timezone.utc)
+            return int(dt.timestamp() * 1000)
+        
+        try:
+            dt = datetime.fromisoformat(date_str)
+        except ValueError:
+            dt = pd.Timestamp(date_str).to_pydatetime()
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
+    
+    @staticmethod
+    def _klines_ttl(interval: str, end_str: Optional[str]) -> int:
+        """TTL кэша свечей в секундах"""
+        # Закрытое историческое окно не меняется - держим сутки
+        if end_str is not None:
+            return 86400
+        # Окно с живой свечой - не дольше интервала и не дольше минуты
+        seconds = int(interval[:-1]) * _INTERVAL_SECONDS.get(interval[-1], 60)
+        return min(seconds, 60)
+    
+    def _lru_get(self, key: str) -> Optional[pd.DataFrame]:
+        """Копия свечей из LRU в памяти (None при промахе)"""
+        df = self._klines_lru.get(key)
+        if df is None:
+            return None
+        self._klines_lru.move_to_end(key)
+        return df.copy()
+    
+    def _lru_set(self, key: str, df: pd.DataFrame):
+        """Запись свечей в LRU с вытеснением самого старого окна"""
+        self._klines_lru[key] = df.copy()
+        self._klines_lru.move_to_end(key)
+        if len(self._klines_lru) > _KLINES_LRU_SIZE:
+            self._klines_lru.popitem(last=False)
+    
+    @staticmethod
+    def _klines_frame(index_ns: np.ndarray, ohlcv: np.ndarray) -> pd.DataFrame:
+        """DataFrame свечей из времени открытия (нс) и блока OHLCV"""
+        return pd.DataFrame(
+            {column: ohlcv[:, i] for i, column in enumerate(_OHLCV_COLUMNS)},
+            index=pd.DatetimeIndex(index_ns.view('datetime64[ns]'), name='timestamp')
+        )
+    
+    async def _cache_get(self, key: str) -> Optional[pd.DataFrame]:
+        """Чтение свечей из Redis (None при промахе или недоступном кэше)"""
+        if self.cache is None:
+            return None
+        try:
+            # Синхронный клиент Redis - в пуле потоков, как и клиент Binance
+            blob = await self._run(self.cache.get, key)
+        except redis.RedisError as e:
+            self.logger.warning(f"Redis cache unavailable: {e}")
+            return None
+        if blob is None:
+            return None
+        
+        # Только числовые массивы (allow_pickle=False): данные из Redis не исполняются
+        try:
+            buf = io.BytesIO(blob)
+            index_ns = np.load(buf, allow_pickle=False)
+            ohlcv = np.load(buf, allow_pickle=False)
+        except (ValueError, OSError) as e:
+            self.logger.warning(f"Invalid klines cache entry {key}: {e}")
+            return None
+        return self._klines_frame(index_ns, ohlcv)
+    
+    async def _cache_set(self, key: str, df: pd.DataFrame, ttl: int):
+        """Запись свечей в Redis"""
+        if self.cache is None:
+            return
+        buf = io.BytesIO()
+        np.save(buf, df.index.asi8, allow_pickle=False)
+        np.save(buf, df[_OHLCV_COLUMNS].to_numpy(), allow_pickle=False)
+        try:
+            await self._run(self.cache.set, key, buf.getvalue(), ex=ttl)
+        except redis.RedisError as e:
+            self.logger.warning(f"Redis cache unavailable: {e}")
             
     async def get_current_price(self, symbol: str) -> float:
         """Получение текущей цены"""
         try:
-            ticker = self.client.get_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
+            entry = self._ticker_cache.get(symbol)
+            if entry is None or time.monotonic() - entry[0] > _TICKER_TTL:
+                await self._refresh_tickers()
+                entry = self._ticker_cache.get(symbol)
+            if entry is None:
+                raise ValueError(f"Unknown symbol {symbol}")
+            return entry[1]
         except Exception as e:
             self.logger.error(f"Error getting current price for {symbol}: {e}")
             raise
+    
+    async def get_tickers(self, symbols: List[str]) -> Dict[str, float]:
+        """Получение текущих цен нескольких пар одним запросом"""
+        now = time.monotonic()
+        if any(s not in self._ticker_cache or now - self._ticker_cache[s][0] > _TICKER_TTL
+               for s in symbols):
+            await self._refresh_tickers()
+        return {s: self._ticker_cache[s][1] for s in symbols if s in self._ticker_cache}
+    
+    async def _refresh_tickers(self):
+        """Обновление кэша цен всех пар; параллельные вызовы ждут один запрос"""
+        # Запрос - отдельная задача под shield: отмена вызывающего не затрагивает остальных
+        task = self._tickers_refresh
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_tickers())
+            self._tickers_refresh = task
+            task.add_done_callback(self._tickers_fetched)
+        await asyncio.shield(task)
+    
+    async def _fetch_tickers(self):
+        """Загрузка цен всех пар в кэш"""
+        tickers = await self._run(self.client.get_symbol_ticker)
+        now = time.monotonic()
+        for ticker in tickers:
+            self._ticker_cache[ticker['symbol']] = (now, float(ticker['price']))
+    
+    def _tickers_fetched(self, task: asyncio.Task):
+        """Снятие завершенного запроса цен"""
+        self._tickers_refresh = None
+        if not task.cancelled():
+            task.exception()  # ошибку получат ожидающие, без предупреждения, если их не осталось
             
     async def get_exchange_info(self, symbol: str) -> Dict:
         """Получение информации о паре"""
-        return self.client.get_symbol_info(symbol)
+        return await self._run(self.client.get_symbol_info, symbol)
     
     async def get_24h_ticker(self, symbol: str) -> Dict:
         """Получение статистики за 24 часа"""
-        return self.client.get_24hr_ticker(symbol=symbol)
\ No newline at end of file
+        return await self._run(self.client.get_24hr_ticker, symbol=symbol)
+    
+    async def _run(self, fn, *args, **kwargs):
+        """Выполнение блокирующего вызова клиента в пуле потоков"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
\ No newline at end of file
@@ -1,84 +1,176 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+import asyncio
+import functools
+from typing import Dict, List, Optional, Tuple
+
+from ._indicator_kernels import HAS_NUMBA, bbands, ema_sma, last_window_maxima, macd, rsi_wilder
+
+try:
+    import talib
+except ImportError:  # TA-Lib опционален, без него RSI и полосы считают ядра
+    talib = None
+
+try:
+    import bottleneck as bn
+except ImportError:  # bottleneck опционален, нужен только без Numba
+    bn = None
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее среднее без Numba: bottleneck, иначе pandas (NaN до заполнения окна)"""
+    if bn is not None:
+        # float64 на входе: bottleneck накапливает сумму в dtype массива
+        return bn.move_mean(values.astype(np.float64, copy=False), window)
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее выборочное стандартное отклонение без Numba"""
+    if bn is not None:
+        return bn.move_std(values.astype(np.float64, copy=False), window, ddof=1)
+    return pd.Series(values).rolling(window).std().to_numpy()
+
 
 class DataProcessor:
     @staticmethod
-    def add_technical_indicators(df: pd.DataFrame, indicators: List[str]) -> pd.DataFrame:
-        """Добавление технических индикаторов"""
-        df = df.copy()
+    def add_technical_indicators(df: pd.DataFrame, indicators: List[str],
+                                 dtype: str = 'float32') -> pd.DataFrame:
+        """Добавление технических индикаторов (столбцы индикаторов в dtype)"""
+        values, columns = DataProcessor.add_technical_indicators_np(
+            df['close'].to_numpy(), indicators, dtype
+        )
+        if not columns:
+            return df.copy()
+        
+        # Индикаторы добавляются к копии df одним concat; ранее посчитанные
+        # столбцы с теми же именами заменяются, а не дублируются
+        return pd.concat([
+            df.drop(columns=columns, errors='ignore'),
+            pd.DataFrame(values, index=df.index, columns=columns)
+        ], axis=1)
+    
+    @staticmethod
+    async def add_technical_indicators_async(df: pd.DataFrame, indicators: List[str],
+                                             dtype: str = 'float32') -> pd.DataFrame:
+        """Добавление индикаторов в пуле потоков, не блокируя event loop"""
+        # Ядра отпускают GIL (nogil), поэтому расчеты по разным парам идут параллельно
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(DataProcessor.add_technical_indicators, df, indicators, dtype)
+        )
+    
+    @staticmethod
+    def add_technical_indicators_np(close: np.ndarray, indicators: List[str],
+                                    dtype: str = 'float32') -> Tuple[np.ndarray, List[str]]:
+        """Технические индикаторы как матрица (n, k) и список имен столбцов
+
+        Матрица в порядке 'F': каждый индикатор лежит в памяти непрерывно
+        и без копирования подается в модели как признаки.
+        """
+        # Ядра читают и пишут в dtype цен, накапливая суммы в float64
+        close = np.ascontiguousarray(close, dtype=dtype)
+        blocks: List[Tuple[List[str], np.ndarray]] = []
         
         if 'RSI' in indicators:
-            df = DataProcessor._add_rsi(df)
+            blocks.append(DataProcessor._add_rsi(close))
             
         if 'MACD' in indicators:
-            df = DataProcessor._add_macd(df)
+            blocks.append(DataProcessor._add_macd(close))
             
         if 'BB' in indicators:
-            df = DataProcessor._add_bollinger_bands(df)
+            blocks.append(DataProcessor._add_bollinger_bands(close))
             
-        if 'EMA' in indicators:
-            df = DataProcessor._add_ema(df)
+        if 'EMA' in indicators and 'SMA' in indicators:
+            blocks.append(DataProcessor._add_ema_sma(close))
             
-        if 'SMA' in indicators:
-            df = DataProcessor._add_sma(df)
+        elif 'EMA' in indicators:
+            blocks.append(DataProcessor._add_ema(close))
             
-        return df
+        elif 'SMA' in indicators:
+            blocks.append(DataProcessor._add_sma(close))
+        
+        columns = [name for names, _ in blocks for name in names]
+        values = np.empty((close.shape[0], len(columns)), dtype=dtype, order='F')
+        j = 0
+        for names, block in blocks:
+            values[:, j:j + len(names)] = block
+            j += len(names)
+        return values, columns
     
     @staticmethod
-    def _add_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        """Добавление RSI"""
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        return df
+    def _add_rsi(close: np.ndarray, period: int = 14) -> Tuple[List[str], np.ndarray]:
+        """Расчет RSI"""
+        if talib is not None:
+            # Тот же RSI Уайлдера с затравкой SMA; TA-Lib принимает только float64
+            return ['rsi'], talib.RSI(close.astype(np.float64), timeperiod=period)[:, None]
+        return ['rsi'], rsi_wilder(close, period)[:, None]
     
     @staticmethod
-    def _add_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
-        """Добавление MACD"""
-        ema_fast = df['close'].ewm(span=fast).mean()
-        ema_slow = df['close'].ewm(span=slow).mean()
-        df['macd'] = ema_fast - ema_slow
-        df['macd_signal'] = df['macd'].ewm(span=signal).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        return df
+    def _add_macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[List[str], np.ndarray]:
+        """Расчет MACD"""
+        return ['macd', 'macd_signal', 'macd_histogram'], macd(close, fast, slow, signal)
     
     @staticmethod
-    def _add_bollinger_bands(df: pd.DataFrame, period: int = 20, std: int = 2) -> pd.DataFrame:
-        """Добавление полос Боллинджера"""
-        df['bb_middle'] = df['close'].rolling(period).mean()
-        bb_std = df['close'].rolling(period).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std * std)
-        df['bb_lower'] = df['bb_middle'] - (bb_std * std)
-        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-        return df
+    def _add_bollinger_bands(close: np.ndarray, period: int = 20, std: int = 2) -> Tuple[List[str], np.ndarray]:
+        """Расчет полос Боллинджера"""
+        columns = ['bb_middle', 'bb_upper', 'bb_lower', 'bb_width']
+        if talib is not None:
+            # BBANDS берет std по генеральной совокупности, множитель приводит к ddof=1
+            k = std * np.sqrt(period / (period - 1))
+            upper, middle, lower = talib.BBANDS(
+                close.astype(np.float64), timeperiod=period, nbdevup=k, nbdevdn=k, matype=0
+            )
+            return columns, np.column_stack([middle, upper, lower, (upper - lower) / middle])
+        
+        if HAS_NUMBA:
+            return columns, bbands(close, period, float(std))
+        
+        middle = _rolling_mean(close, period)
+        band = _rolling_std(close, period) * std
+        return columns, np.column_stack([middle, middle + band, middle - band, 2 * band / middle])
     
     @staticmethod
-    def _add_ema(df: pd.DataFrame, periods: List[int] = [20, 50]) -> pd.DataFrame:
-        """Добавление EMA"""
-        for period in periods:
-            df[f'ema_{period}'] = df['close'].ewm(span=period).mean()
-        return df
+    def _add_ema(close: np.ndarray, periods: List[int] = [20, 50]) -> Tuple[List[str], np.ndarray]:
+        """Расчет EMA"""
+        return DataProcessor._add_ema_sma(close, ema_periods=periods, sma_periods=[])
     
     @staticmethod
-    def _add_sma(df: pd.DataFrame, periods: List[int] = [20, 50]) -> pd.DataFrame:
-        """Добавление SMA"""
-        for period in periods:
-            df[f'sma_{period}'] = df['close'].rolling(period).mean()
-        return df
+    def _add_sma(close: np.ndarray, periods: List[int] = [20, 50]) -> Tuple[List[str], np.ndarray]:
+        """Расчет SMA"""
+        return DataProcessor._add_ema_sma(close, ema_periods=[], sma_periods=periods)
+    
+    @staticmethod
+    def _add_ema_sma(close: np.ndarray, ema_periods: List[int] = [20, 50],
+                     sma_periods: List[int] = [20, 50]) -> Tuple[List[str], np.ndarray]:
+        """Расчет EMA и SMA за одно чтение цен закрытия"""
+        columns = [f'ema_{p}' for p in ema_periods] + [f'sma_{p}' for p in sma_periods]
+        if HAS_NUMBA:
+            return columns, ema_sma(
+                close,
+                np.asarray(ema_periods, dtype=np.int64),
+                np.asarray(sma_periods, dtype=np.int64)
+            )
+        
+        series = pd.Series(close)
+        return columns, np.column_stack(
+            [series.ewm(span=p, adjust=False).mean().to_numpy() for p in ema_periods] +
+            [_rolling_mean(close, p) for p in sma_periods]
+        )
     
     @staticmethod
-    def detect_support_resistance(df: pd.DataFrame, window: int = 20) -> Dict:
+    def detect_support_resistance(df: pd.DataFrame, window: int = 20,
+                                  tick_size: Optional[float] = None) -> Dict:
         """Обнаружение уровней поддержки и сопротивления"""
-        highs = df['high'].rolling(window=window, center=True).max()
-        lows = df['low'].rolling(window=window, center=True).min()
+        # Последние 5 локальных максимумов high и минимумов low (минимум - максимум -low)
+        resistance_levels = last_window_maxima(df['high'].to_numpy(np.float64), window, 5)
+        support_levels = -last_window_maxima(-df['low'].to_numpy(np.float64), window, 5)
         
-        resistance_levels = highs[highs == df['high']].dropna().tail(5).tolist()
-        support_levels = lows[lows == df['low']].dropna().tail(5).tolist()
+        # Близкие уровни сливаются округлением до шага цены
+        if tick_size:
+            resistance_levels = np.round(resistance_levels / tick_size) * tick_size
+            support_levels = np.round(support_levels / tick_size) * tick_size
         
         return {
-            'resistance': sorted(list(set(resistance_levels))),
-            'support': sorted(list(set(support_levels)))
+            'resistance': np.unique(resistance_levels).tolist(),
+            'support': np.unique(support_levels).tolist()
         }
\ No newline at end of file
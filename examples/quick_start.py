@@ -37,18 +37,23 @@ async def quick_analysis():
     print(f"🔧 Методы: {', '.join(methods)}")
     print("-" * 50)
     
-    for symbol in symbols:
+    print(f"\n🔍 Анализируем {', '.join(symbols)}...")
+    
+    # Запуск анализа всех пар параллельно
+    results = await asyncio.gather(*(
+        agent.analyze_pair(
+            symbol=symbol,
+            timeframe=timeframe,
+            analysis_methods=methods,
+            include_news=False,
+            include_fundamental=False
+        ) for symbol in symbols
+    ), return_exceptions=True)
+    
+    for symbol, result in zip(symbols, results):
         try:
-            print(f"\n🔍 Анализируем {symbol}...")
-            
-            # Запуск анализа
-            result = await agent.analyze_pair(
-                symbol=symbol,
-                timeframe=timeframe,
-                analysis_methods=methods,
-                include_news=False,
-                include_fundamental=False
-            )
+            if isinstance(result, Exception):
+                raise result
             
             signal = result['ai_signal']
             
@@ -4,7 +4,7 @@
 """
 
 import asyncio
-import json
+import orjson
 from datetime import datetime, timedelta
 from core.universal_agent import UniversalAIAgent
 from core.config import AppConfig
@@ -33,21 +33,36 @@ async def comprehensive_analysis():
     print(f"⏰ Таймфреймы: {', '.join(timeframes)}")
     print()
     
+    # Все комбинации запускаются параллельно, не больше 5 запросов к API одновременно
+    semaphore = asyncio.Semaphore(5)
+    
+    async def run(timeframe, methods):
+        async with semaphore:
+            return await agent.analyze_pair(
+                symbol=symbol,
+                timeframe=timeframe,
+                analysis_methods=methods,
+                include_news=True,
+                include_fundamental=True
+            )
+    
+    print("🔄 Запуск анализа всех комбинаций...")
+    results = await asyncio.gather(*(
+        run(timeframe, methods) for timeframe in timeframes for methods in methods_combinations
+    ), return_exceptions=True)
+    results = iter(results)
+    
     for timeframe in timeframes:
         print(f"\n📊 АНАЛИЗ НА ТАЙМФРЕЙМЕ {timeframe}:")
         print("-" * 40)
         
         for methods in methods_combinations:
+            result = next(results)
             try:
                 print(f"\n🔧 Методы: {', '.join(methods)}")
                 
-                result = await agent.analyze_pair(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    analysis_methods=methods,
-                    include_news=True,
-                    include_fundamental=True
-                )
+                if isinstance(result, Exception):
+                    raise result
                 
                 signal = result['ai_signal']
                 
@@ -97,14 +112,20 @@ async def multi_timeframe_analysis():
     
     signals_summary = {}
     
-    for timeframe in timeframes:
+    # Все таймфреймы анализируются параллельно
+    results = await asyncio.gather(*(
+        agent.analyze_pair(
+            symbol=symbol,
+            timeframe=timeframe,
+            analysis_methods=methods,
+            include_news=False
+        ) for timeframe in timeframes
+    ), return_exceptions=True)
+    
+    for timeframe, result in zip(timeframes, results):
         try:
-            result = await agent.analyze_pair(
-                symbol=symbol,
-                timeframe=timeframe,
-                analysis_methods=methods,
-                include_news=False
-            )
+            if isinstance(result, Exception):
+                raise result
             
             signal = result['ai_signal']
             signals_summary[timeframe] = {
@@ -167,7 +188,7 @@ async def export_analysis_results():
         export_data = {
             'symbol': result['symbol'],
             'timeframe': result['timeframe'],
-            'timestamp': result['timestamp'].isoformat(),
+            'timestamp': result['timestamp'],
             'current_price': result['current_price'],
             'signal': {
                 'action': result['ai_signal'].action,
@@ -184,8 +205,9 @@ async def export_analysis_results():
         
         # Сохранение в JSON файл
         filename = f"analysis_{symbol}_{timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        # orjson сам кодирует datetime и numpy-числа и пишет UTF-8
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(export_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
         
         print(f"✅ Результаты сохранены в файл: {filename}")
         print(f"📊 Данные для {symbol} на {timeframe} успешно экспортированы")
@@ -133,17 +133,30 @@ async def compare_strategies():
     
     results = []
     
-    for strategy in strategies:
-        try:
-            print(f"🔍 Тестируем: {strategy['name']}...")
-            
-            result = await backtester.run_enhanced_backtest(
+    # Каждый бэктест делает один запрос к ИИ в секунду: одновременно
+    # не больше двух, чтобы не превысить лимиты API
+    semaphore = asyncio.Semaphore(2)
+    
+    async def run(strategy):
+        async with semaphore:
+            return await backtester.run_enhanced_backtest(
                 symbol=symbol,
                 timeframe=timeframe,
                 analysis_methods=strategy['methods'],
                 start_date=start_date,
                 end_date=end_date
             )
+    
+    print(f"🔍 Тестируем: {', '.join(s['name'] for s in strategies)}...")
+    
+    backtest_results = await asyncio.gather(
+        *(run(strategy) for strategy in strategies), return_exceptions=True
+    )
+    
+    for strategy, result in zip(strategies, backtest_results):
+        try:
+            if isinstance(result, Exception):
+                raise result
             
             metrics = result.metrics
             
@@ -155,10 +168,10 @@ async def compare_strategies():
                 'profit_factor': metrics['profit_factor']
             })
             
-            print(f"   ✅ Завершено: {metrics['total_trades']} сделок, Win Rate: {metrics['win_rate']:.1%}")
+            print(f"   ✅ {strategy['name']}: {metrics['total_trades']} сделок, Win Rate: {metrics['win_rate']:.1%}")
             
         except Exception as e:
-            print(f"   ❌ Ошибка: {e}")
+            print(f"   ❌ {strategy['name']}: {e}")
             continue
     
     # Вывод результатов сравнения
@@ -29,6 +29,12 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        # JIT-ядра индикаторов и скользящие окна без Numba
+        "fast": ["numba>=0.56.0", "bottleneck>=1.3.0"],
+        # Кэширование свечей в Redis (включается через REDIS_URL)
+        "cache": ["redis>=4.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "crypto-ai=cli:main",
@@ -1,3 +1,4 @@
+import sys
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 import pandas as pd
@@ -6,7 +7,10 @@ from ..analysis.wyckoff import WyckoffPhase
 from ..analysis.elliott import ElliottWave
 from ..analysis.sentiment import SentimentAnalysis
 
-@dataclass
+# slots=True есть только с Python 3.10; на 3.8/3.9 - обычный frozen dataclass
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
 class TradingSignal:
     symbol: str
     action: str  # 'BUY', 'SELL', 'HOLD'
@@ -27,6 +31,12 @@ class SignalGenerator:
             'elliott': 0.2,
             'sentiment': 0.1
         }
+        
+        # Веса как атрибуты: без поиска по словарю на каждый сигнал
+        self._w_technical = self.confidence_weights['technical']
+        self._w_wyckoff = self.confidence_weights['wyckoff']
+        self._w_elliott = self.confidence_weights['elliott']
+        self._w_sentiment = self.confidence_weights['sentiment']
     
     def generate_signal(
         self,
@@ -35,9 +45,16 @@ class SignalGenerator:
         wyckoff: WyckoffPhase,
         elliott: ElliottWave,
         sentiment: SentimentAnalysis,
-        current_price: float
+        current_price: float,
+        timestamp: Optional[pd.Timestamp] = None
     ) -> TradingSignal:
-        """Генерация финального торгового сигнала"""
+        """Генерация финального торгового сигнала
+        
+        В бэктесте передается timestamp бара; без него берется текущее время.
+        """
+        
+        if timestamp is None:
+            timestamp = pd.Timestamp.now()
         
         # Совмещение сигналов от разных методов
         combined_signal, combined_confidence, reasons = self._combine_signals(
@@ -54,7 +71,7 @@ class SignalGenerator:
                 take_profit=None,
                 timeframe='N/A',
                 reasons=reasons,
-                timestamp=pd.Timestamp.now()
+                timestamp=timestamp
             )
         
         # Расчет уровней стоп-лосса и тейк-профита
@@ -71,67 +88,66 @@ class SignalGenerator:
             take_profit=take_profit,
             timeframe='4h',  # Можно сделать динамическим
             reasons=reasons,
-            timestamp=pd.Timestamp.now()
+            timestamp=timestamp
         )
     
     def _combine_signals(self, technical, wyckoff, elliott, sentiment):
         """Совмещение сигналов от разных анализов"""
-        signals = []
-        confidences = []
+        # Счетчики голосов и сумма взвешенных уверенностей вместо списков
+        buy_count = 0
+        sell_count = 0
+        confidence_sum = 0.0
         reasons = []
         
         # Технический анализ
         if technical.signal_type != 'HOLD':
-            signals.append(technical.signal_type)
-            confidences.append(technical.confidence * self.confidence_weights['technical'])
+            if technical.signal_type == 'BUY':
+                buy_count += 1
+            else:
+                sell_count += 1
+            confidence_sum += technical.confidence * self._w_technical
             reasons.append(f"Технический анализ: {technical.description}")
         
         # Анализ Вайкоффа
-        if wyckoff.phase_type in ['MARKUP', 'ACCUMULATION']:
-            signals.append('BUY')
-            confidences.append(wyckoff.confidence * self.confidence_weights['wyckoff'])
+        if wyckoff.phase_type in ('MARKUP', 'ACCUMULATION'):
+            buy_count += 1
+            confidence_sum += wyckoff.confidence * self._w_wyckoff
             reasons.append(f"Фаза Вайкоффа: {wyckoff.phase_type}")
-        elif wyckoff.phase_type in ['MARKDOWN', 'DISTRIBUTION']:
-            signals.append('SELL') 
-            confidences.append(wyckoff.confidence * self.confidence_weights['wyckoff'])
+        elif wyckoff.phase_type in ('MARKDOWN', 'DISTRIBUTION'):
+            sell_count += 1
+            confidence_sum += wyckoff.confidence * self._w_wyckoff
             reasons.append(f"Фаза Вайкоффа: {wyckoff.phase_type}")
         
         # Анализ волн Эллиотта
         if elliott.wave_type == 'IMPULSE':
-            signals.append('BUY')
-            confidences.append(elliott.confidence * self.confidence_weights['elliott'])
+            buy_count += 1
+            confidence_sum += elliott.confidence * self._w_elliott
             reasons.append(f"Волны Эллиотта: {elliott.wave_type} волна {elliott.current_wave}")
         elif elliott.wave_type == 'CORRECTIVE':
-            signals.append('SELL')
-            confidences.append(elliott.confidence * self.confidence_weights['elliott'])
+            sell_count += 1
+            confidence_sum += elliott.confidence * self._w_elliott
             reasons.append(f"Волны Эллиотта: {elliott.wave_type} волна {elliott.current_wave}")
         
         # Анализ настроений
         if sentiment.overall_sentiment == 'BULLISH':
-            signals.append('BUY')
-            confidences.append(sentiment.confidence * self.confidence_weights['sentiment'])
+            buy_count += 1
+            confidence_sum += sentiment.confidence * self._w_sentiment
             reasons.append("Позитивный новостной фон")
         elif sentiment.overall_sentiment == 'BEARISH':
-            signals.append('SELL')
-            confidences.append(sentiment.confidence * self.confidence_weights['sentiment'])
+            sell_count += 1
+            confidence_sum += sentiment.confidence * self._w_sentiment
             reasons.append("Негативный новостной фон")
         
-        if not signals:
+        if buy_count == 0 and sell_count == 0:
             return 'HOLD', 0.0, ["Недостаточно данных для сигнала"]
         
+        # Равенство голосов - сразу HOLD без расчета уверенности
+        if buy_count == sell_count:
+            return 'HOLD', 0.0, reasons
+        
         # Подсчет преобладающего сигнала
-        buy_count = signals.count('BUY')
-        sell_count = signals.count('SELL')
-        
-        if buy_count > sell_count:
-            final_signal = 'BUY'
-            final_confidence = sum(confidences) / len(signals)
-        elif sell_count > buy_count:
-            final_signal = 'SELL'
-            final_confidence = sum(confidences) / len(signals)
-        else:
-            final_signal = 'HOLD'
-            final_confidence = 0.0
+        final_signal = 'BUY' if buy_count > sell_count else 'SELL'
+        final_confidence = confidence_sum / (buy_count + sell_count)
         
         return final_signal, final_confidence, reasons
     
@@ -6,6 +6,10 @@ import numpy as np
 from typing import List, Dict, Optional
 from datetime import datetime
 from ..backtesting.ai_backtester import AIBacktestResult
+from .downsample import lttb_indices
+
+# Больше точек на трейс в браузер не отправляем
+MAX_CHART_POINTS = 5000
 
 class BacktestPlotter:
     def __init__(self):
@@ -41,14 +45,45 @@ class BacktestPlotter:
             row_heights=[0.6, 0.2, 0.2]
         )
         
+        # Скользящие средние считаются один раз и не записываются в historical_data
+        sma_20 = historical_data['close'].rolling(20).mean()
+        sma_50 = historical_data['close'].rolling(50).mean()
+        
+        # Длинную историю укрупняем: свечи по бакетам, линии через LTTB
+        if len(historical_data) > MAX_CHART_POINTS:
+            historical_data = self._bucket_ohlcv(historical_data)
+            sma_20 = self._downsample_line(sma_20.dropna())
+            sma_50 = self._downsample_line(sma_50.dropna())
+        
+        # Трейсы собираются в список и добавляются одним вызовом add_traces
+        traces_rows = []
+        
         # 1. График цены с точками входа/выхода
-        self._add_price_chart(fig, historical_data, backtest_results, row=1)
+        traces_rows += [(t, 1) for t in self._price_chart_traces(
+            historical_data, backtest_results, sma_20, sma_50
+        )]
         
         # 2. График объемов
-        self._add_volume_chart(fig, historical_data, row=2)
+        traces_rows += [(t, 2) for t in self._volume_chart_traces(historical_data)]
         
         # 3. Кривая капитала
-        self._add_equity_curve(fig, backtest_results, row=3)
+        equity_traces = self._equity_curve_traces(backtest_results)
+        traces_rows += [(t, 3) for t in equity_traces]
+        
+        fig.add_traces(
+            [t for t, _ in traces_rows],
+            rows=[r for _, r in traces_rows],
+            cols=[1] * len(traces_rows)
+        )
+        
+        if equity_traces:
+            # Добавляем линию начального капитала
+            fig.add_hline(
+                y=10000, 
+                line_dash="dash", 
+                line_color="gray",
+                row=3, col=1
+            )
         
         # Обновляем layout
         fig.update_layout(
@@ -62,12 +97,12 @@ class BacktestPlotter:
         
         return fig
     
-    def _add_price_chart(self, fig: go.Figure, data: pd.DataFrame, 
-                        results: AIBacktestResult, row: int):
-        """Добавление графика цены с точками входа/выхода"""
+    def _price_chart_traces(self, data: pd.DataFrame, results: AIBacktestResult,
+                            sma_20: pd.Series, sma_50: pd.Series) -> List:
+        """Трейсы графика цены с точками входа/выхода"""
         
         # Свечной график
-        fig.add_trace(
+        traces = [
             go.Candlestick(
                 x=data.index,
                 open=data['open'],
@@ -75,35 +110,21 @@ class BacktestPlotter:
                 low=data['low'],
                 close=data['close'],
                 name='Price'
-            ),
-            row=row, col=1
-        )
+            )
+        ]
         
-        # Точки входа (BUY)
-        buy_signals = []
-        sell_signals = []
-        
-        for result in results.detailed_results:
-            if result['signal'].action == 'BUY' and result['signal'].confidence > 0.7:
-                buy_signals.append({
-                    'timestamp': result['timestamp'],
-                    'price': result['actual_price'],
-                    'confidence': result['signal'].confidence
-                })
-            elif result['signal'].action == 'SELL' and result['signal'].confidence > 0.7:
-                sell_signals.append({
-                    'timestamp': result['timestamp'],
-                    'price': result['actual_price'],
-                    'confidence': result['signal'].confidence
-                })
+        # Точки входа/выхода: маски по столбцам результатов вместо цикла по словарям
+        frame = results.results_frame
+        confident = frame['confidence'] > 0.7
+        buy_df = frame[(frame['action'] == 'BUY') & confident]
+        sell_df = frame[(frame['action'] == 'SELL') & confident]
         
         # Добавляем точки BUY
-        if buy_signals:
-            buy_df = pd.DataFrame(buy_signals)
-            fig.add_trace(
+        if not buy_df.empty:
+            traces.append(
                 go.Scatter(
                     x=buy_df['timestamp'],
-                    y=buy_df['price'],
+                    y=buy_df['actual_price'],
                     mode='markers',
                     marker=dict(
                         symbol='triangle-up',
@@ -119,17 +140,15 @@ class BacktestPlotter:
                         'Уверенность: %{customdata:.2%}<extra></extra>'
                     ),
                     customdata=buy_df['confidence']
-                ),
-                row=row, col=1
+                )
             )
         
         # Добавляем точки SELL
-        if sell_signals:
-            sell_df = pd.DataFrame(sell_signals)
-            fig.add_trace(
+        if not sell_df.empty:
+            traces.append(
                 go.Scatter(
                     x=sell_df['timestamp'],
-                    y=sell_df['price'],
+                    y=sell_df['actual_price'],
                     mode='markers',
                     marker=dict(
                         symbol='triangle-down',
@@ -145,92 +164,95 @@ class BacktestPlotter:
                         'Уверенность: %{customdata:.2%}<extra></extra>'
                     ),
                     customdata=sell_df['confidence']
-                ),
-                row=row, col=1
+                )
             )
         
         # Добавляем скользящие средние для контекста
-        data['SMA_20'] = data['close'].rolling(20).mean()
-        data['SMA_50'] = data['close'].rolling(50).mean()
-        
-        fig.add_trace(
+        traces.append(
             go.Scatter(
-                x=data.index,
-                y=data['SMA_20'],
+                x=sma_20.index,
+                y=sma_20.to_numpy(),
                 line=dict(color='orange', width=1),
                 name='SMA 20'
-            ),
-            row=row, col=1
+            )
         )
         
-        fig.add_trace(
+        traces.append(
             go.Scatter(
-                x=data.index,
-                y=data['SMA_50'],
+                x=sma_50.index,
+                y=sma_50.to_numpy(),
                 line=dict(color='purple', width=1),
                 name='SMA 50'
-            ),
-            row=row, col=1
+            )
         )
+        
+        return traces
     
-    def _add_volume_chart(self, fig: go.Figure, data: pd.DataFrame, row: int):
-        """Добавление графика объемов"""
+    def _volume_chart_traces(self, data: pd.DataFrame) -> List:
+        """Трейсы графика объемов"""
         
-        colors = ['red' if close < open else 'green' 
-                 for close, open in zip(data['close'], data['open'])]
+        colors = np.where(data['close'].to_numpy() < data['open'].to_numpy(), 'red', 'green')
         
-        fig.add_trace(
+        return [
             go.Bar(
                 x=data.index,
                 y=data['volume'],
                 marker_color=colors,
                 name='Volume',
                 opacity=0.7
-            ),
-            row=row, col=1
-        )
+            )
+        ]
     
-    def _add_equity_curve(self, fig: go.Figure, results: AIBacktestResult, row: int):
-        """Добавление кривой капитала"""
+    def _equity_curve_traces(self, results: AIBacktestResult) -> List:
+        """Трейсы кривой капитала"""
         
         # Создаем кривую капитала из детальных результатов
-        equity_data = []
-        current_equity = 10000
-        
-        for result in results.detailed_results:
-            # Упрощенная логика изменения капитала
-            if result['was_correct'] is True:
-                current_equity *= 1.02
-            elif result['was_correct'] is False:
-                current_equity *= 0.98
-            
-            equity_data.append({
-                'timestamp': result['timestamp'],
-                'equity': current_equity
-            })
-        
-        if equity_data:
-            equity_df = pd.DataFrame(equity_data)
-            
-            fig.add_trace(
-                go.Scatter(
-                    x=equity_df['timestamp'],
-                    y=equity_df['equity'],
-                    line=dict(color=self.color_scheme['equity'], width=3),
-                    name='Equity Curve',
-                    fill='tozeroy',
-                    fillcolor='rgba(30, 144, 255, 0.1)'
-                ),
-                row=row, col=1
-            )
-            
-            # Добавляем линию начального капитала
-            fig.add_hline(
-                y=10000, 
-                line_dash="dash", 
-                line_color="gray",
-                row=row, col=1
+        frame = results.results_frame
+        
+        if frame.empty:
+            return []
+        
+        # Упрощенная логика изменения капитала: +2% за верный сигнал, -2% за неверный
+        was_correct = frame['was_correct'].to_numpy()
+        factors = np.where(was_correct == True, 1.02, np.where(was_correct == False, 0.98, 1.0))
+        equity = self._downsample_line(
+            pd.Series(10000 * np.cumprod(factors), index=pd.DatetimeIndex(frame['timestamp']))
+        )
+        
+        return [
+            go.Scatter(
+                x=equity.index,
+                y=equity.to_numpy(),
+                line=dict(color=self.color_scheme['equity'], width=3),
+                name='Equity Curve',
+                fill='tozeroy',
+                fillcolor='rgba(30, 144, 255, 0.1)'
             )
+        ]
+
+    def _bucket_ohlcv(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Укрупнение свечей до MAX_CHART_POINTS баров с равным числом исходных свечей"""
+        
+        bucket = -(-len(data) // MAX_CHART_POINTS)
+        keys = np.arange(len(data)) // bucket
+        bucketed = data.groupby(keys).agg({
+            'open': 'first',
+            'high': 'max',
+            'low': 'min',
+            'close': 'last',
+            'volume': 'sum'
+        })
+        bucketed.index = data.index[::bucket]
+        return bucketed
+    
+    def _downsample_line(self, series: pd.Series) -> pd.Series:
+        """LTTB-даунсемплинг временного ряда до MAX_CHART_POINTS точек"""
+        
+        if len(series) <= MAX_CHART_POINTS:
+            return series
+        
+        idx = lttb_indices(series.index.asi8, series.to_numpy(), MAX_CHART_POINTS)
+        return series.iloc[idx]
 
     def create_performance_dashboard(self, results: AIBacktestResult) -> go.Figure:
         """Создание дашборда с метриками производительности"""
@@ -266,21 +288,13 @@ class BacktestPlotter:
     def create_signals_timeline(self, results: AIBacktestResult) -> go.Figure:
         """Создание таймлайна сигналов"""
         
-        signals_data = []
-        for result in results.detailed_results:
-            if result['signal'].action != 'HOLD':
-                signals_data.append({
-                    'timestamp': result['timestamp'],
-                    'signal': result['signal'].action,
-                    'confidence': result['signal'].confidence,
-                    'price': result['actual_price'],
-                    'correct': result['was_correct']
-                })
-        
-        if not signals_data:
-            return go.Figure()
+        frame = results.results_frame
+        signals_df = frame.loc[frame['action'] != 'HOLD'].rename(columns={
+            'action': 'signal', 'actual_price': 'price', 'was_correct': 'correct'
+        })
         
-        signals_df = pd.DataFrame(signals_data)
+        if signals_df.empty:
+            return go.Figure()
         
         fig = go.Figure()
         